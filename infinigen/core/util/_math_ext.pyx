@@ -0,0 +1,33 @@
+# Copyright (c) Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+#cython: language_level=3
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: nonecheck=False
+
+cdef void _apply_mat4(float[:, ::1] verts, float[:, ::1] M4, float[:, ::1] out) noexcept nogil:
+    # out = verts @ M4[:3, :3].T + M4[:3, 3], assumes M4 is affine so no homogeneous divide is needed
+    cdef Py_ssize_t i, n = verts.shape[0]
+    cdef float x, y, z
+    for i in range(n):
+        x = verts[i, 0]
+        y = verts[i, 1]
+        z = verts[i, 2]
+        out[i, 0] = M4[0, 0] * x + M4[0, 1] * y + M4[0, 2] * z + M4[0, 3]
+        out[i, 1] = M4[1, 0] * x + M4[1, 1] * y + M4[1, 2] * z + M4[1, 3]
+        out[i, 2] = M4[2, 0] * x + M4[2, 1] * y + M4[2, 2] * z + M4[2, 3]
+
+
+def apply_mat4(float[:, ::1] verts, float[:, ::1] M4, float[:, ::1] out):
+    # the loop above runs without bounds checks, so validate shapes before entering it
+    if M4.shape[0] < 3 or M4.shape[1] != 4:
+        raise ValueError(f'apply_mat4 expected M4 of shape (3 or 4, 4), got ({M4.shape[0]}, {M4.shape[1]})')
+    if verts.shape[1] != 3:
+        raise ValueError(f'apply_mat4 expected verts of shape (N, 3), got ({verts.shape[0]}, {verts.shape[1]})')
+    if out.shape[0] != verts.shape[0] or out.shape[1] != verts.shape[1]:
+        raise ValueError(
+            f'apply_mat4 expected out to match verts shape ({verts.shape[0]}, {verts.shape[1]}), '
+            f'got ({out.shape[0]}, {out.shape[1]})')
+    with nogil:
+        _apply_mat4(verts, M4, out)
@@ -0,0 +1,23 @@
+# Copyright (c) Princeton University.
+# This source code is licensed under the BSD 3-Clause license found in the LICENSE file in the root directory of this source tree.
+
+# numba kernels for infinigen.core.util.math, kept separate so that numba is only imported when first needed
+
+import numba as nb
+
+# the serial and parallel kernels must be separate python functions: numba's on-disk cache is keyed
+# by function qualname and ignores the parallel option, so a shared function would share one cache entry
+
+@nb.njit(cache=True)
+def apply_affine_serial(verts, R, t, out):
+    for i in range(verts.shape[0]):
+        x, y, z = verts[i, 0], verts[i, 1], verts[i, 2]
+        for j in range(3):
+            out[i, j] = R[j, 0] * x + R[j, 1] * y + R[j, 2] * z + t[j]
+
+@nb.njit(cache=True, parallel=True)
+def apply_affine_parallel(verts, R, t, out):
+    for i in nb.prange(verts.shape[0]):
+        x, y, z = verts[i, 0], verts[i, 1], verts[i, 2]
+        for j in range(3):
+            out[i, j] = R[j, 0] * x + R[j, 1] * y + R[j, 2] * z + t[j]
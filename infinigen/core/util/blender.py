@@ -6,7 +6,6 @@
 
 from collections import defaultdict
 import pdb
-from math import prod
 from contextlib import nullcontext
 import logging
 
@@ -60,14 +59,21 @@ class ViewportMode:
 
     def __enter__(self):
         self.orig_active = bpy.context.active_object
-        bpy.context.view_layer.objects.active = self.obj
-        self.orig_mode = bpy.context.object.mode
-        bpy.ops.object.mode_set(mode=self.mode)
+        if self.orig_active != self.obj:
+            bpy.context.view_layer.objects.active = self.obj
+        self.orig_mode = self.obj.mode
+
+        # mode_set is an expensive operator call, skip it if we are already in the right mode
+        self.switched_mode = self.orig_mode != self.mode
+        if self.switched_mode:
+            bpy.ops.object.mode_set(mode=self.mode)
 
     def __exit__(self, *args):
-        bpy.context.view_layer.objects.active = self.obj
-        bpy.ops.object.mode_set(mode=self.orig_mode)
-        bpy.context.view_layer.objects.active = self.orig_active
+        if self.switched_mode:
+            bpy.context.view_layer.objects.active = self.obj
+            bpy.ops.object.mode_set(mode=self.orig_mode)
+        if bpy.context.active_object != self.orig_active:
+            bpy.context.view_layer.objects.active = self.orig_active
 
 
 class CursorLocation:
@@ -90,12 +96,22 @@ class SelectObjects:
         self.objects = list(objects) if hasattr(objects, '__iter__') else [objects]
         self.active = active
 
-        self.saved_objs = None
+        self.saved_objects = None
         self.saved_active = None
 
+    @staticmethod
+    def _resolve(saved):
+        # look the object up by name, but only accept it if it is the same underlying object,
+        # since a deleted object's name may since have been reused by an unrelated new one
+        name, ptr = saved
+        o = bpy.data.objects.get(name)
+        return o if o is not None and o.as_pointer() == ptr else None
+
     def __enter__(self):
-        self.saved_objects = list(bpy.context.selected_objects)
-        self.saved_active = bpy.context.active_object
+        # save (name, pointer) rather than the objects themselves, which dangle if the object gets deleted
+        self.saved_objects = [(o.name, o.as_pointer()) for o in bpy.context.selected_objects]
+        active = bpy.context.active_object
+        self.saved_active = (active.name, active.as_pointer()) if active is not None else None
         select_none()
         select(self.objects)
 
@@ -108,19 +124,13 @@ class SelectObjects:
     def __exit__(self, *_):
 
         # our saved selection / active objects may have been deleted, update them to only include valid ones
-        def enforce_not_deleted(o):
-            try:
-                return o if o.name in bpy.data.objects else None
-            except ReferenceError:
-                return None
-            
-        self.saved_objects = [enforce_not_deleted(o) for o in self.saved_objects]
-        self.saved_objects = [o for o in self.saved_objects if o is not None]
+        saved_objects = [self._resolve(s) for s in self.saved_objects]
+        saved_objects = [o for o in saved_objects if o is not None]
 
         select_none()
-        select(self.saved_objects)
+        select(saved_objects)
         if self.saved_active is not None:
-            bpy.context.view_layer.objects.active = enforce_not_deleted(self.saved_active)
+            bpy.context.view_layer.objects.active = self._resolve(self.saved_active)
 
 
 class DisableModifiers:
@@ -132,11 +142,25 @@ class DisableModifiers:
 
     def __enter__(self):
         for o in self.objs:
-            for m in o.modifiers:
-                if not m.show_viewport or m in self.keep:
-                    continue
-                self.modifiers_disabled.append(m)
-                m.show_viewport = False
+            mods = o.modifiers
+            if len(mods) == 0:
+                continue
+
+            # read and write all show_viewport flags of the stack in one foreach call each
+            shown = np.empty(len(mods), dtype=bool)
+            mods.foreach_get("show_viewport", shown)
+            disable = shown.copy()
+            for m in self.keep:
+                i = mods.find(m.name) if m.id_data == o else -1
+                if i >= 0:
+                    disable[i] = False
+
+            self.modifiers_disabled.extend(mods[i] for i in np.flatnonzero(disable))
+            shown[disable] = False
+            mods.foreach_set("show_viewport", shown)
+
+            # foreach_set skips the rna update callbacks, so tag the object for re-evaluation ourselves
+            o.update_tag()
 
     def __exit__(self, *_):
         for m in self.modifiers_disabled:
@@ -178,12 +202,13 @@ def garbage_collect(targets, keep_in_use=True, keep_names=None, verbose=False):
         keep_names = [[]] * len(targets)
 
     for t, orig in zip(targets, keep_names):
-        for o in t:
-            if keep_in_use and o.users > 0:
-                continue
-            if o.name in orig:
+        orig = set(orig)
+        candidates = [n for n in t.keys() if n not in orig and '(no gc)' not in n]
+        for name in candidates:
+            o = t.get(name)
+            if o is None:
                 continue
-            if '(no gc)' in o.name:
+            if keep_in_use and o.users > 0:
                 continue
             if verbose:
                 print(f'Garbage collecting {o} from {t}')
@@ -199,35 +224,58 @@ class GarbageCollect:
         self.verbose = verbose
 
     def __enter__(self):
-        self.names = [set(o.name for o in t) for t in self.targets]
+        self.names = [set(t.keys()) for t in self.targets]
 
     def __exit__(self, *_):
         garbage_collect(self.targets, keep_in_use=self.keep_in_use, keep_names=self.names, verbose=self.verbose)
 
 
 def select_none():
-    if hasattr(bpy.context, "active_object") and bpy.context.active_object is not None:
-        bpy.context.active_object.select_set(False)
-    if hasattr(bpy.context, "selected_objects"):
-        for obj in bpy.context.selected_objects:
-            obj.select_set(False)
+    selected = getattr(bpy.context, "selected_objects", [])
+    active = getattr(bpy.context, "active_object", None)
+    if active is not None and active not in selected:
+        active.select_set(False)
+    for obj in selected:
+        obj.select_set(False)
 
 
 def select(objs):
-    select_none()
     if not isinstance(objs, list):
         objs = [objs]
+    if not hasattr(bpy.context, "selected_objects"):
+        select_none()
+        for o in objs:
+            o.select_set(True)
+        return
+
+    # only touch objects whose selection state actually changes, rather than
+    # deselecting everything and reselecting objects which were already selected
+    targets = set(objs)
+    selected = set(bpy.context.selected_objects)
+    active = bpy.context.active_object
+    if active is not None and active not in targets:
+        active.select_set(False)
+    for o in selected - targets:
+        o.select_set(False)
     for o in objs:
-        o.select_set(True)
+        if o not in selected:
+            o.select_set(True)
 
 
-def delete(objs):
+def delete(objs, use_ops=False):
     if not isinstance(objs, list):
         objs = [objs]
-    select_none()
-    select(objs)
-    with Suppress():
-        bpy.ops.object.delete()
+
+    if use_ops:
+        # full operator semantics, needs a valid context and pushes an undo step
+        select_none()
+        select(objs)
+        with Suppress():
+            bpy.ops.object.delete()
+        return
+
+    for o in dict.fromkeys(objs):
+        bpy.data.objects.remove(o, do_unlink=True)
 
 
 def delete_collection(collection):
@@ -240,16 +288,46 @@ def delete_collection(collection):
         delete(collection)
 
 
+_children_map = None
+
+class CachedChildrenMap:
+
+    # obj.children scans all of bpy.data.objects on every access, so code which walks
+    # many object trees can build the parent -> children mapping once up front.
+    # The map is not updated if objects are created or reparented inside the context
+
+    def __enter__(self):
+        global _children_map
+        self.prev = _children_map
+        _children_map = defaultdict(list)
+        for o in bpy.data.objects:
+            if o.parent is not None:
+                _children_map[o.parent].append(o)
+        return _children_map
+
+    def __exit__(self, *_):
+        global _children_map
+        _children_map = self.prev
+
+
+def get_children(obj):
+    if _children_map is not None:
+        return _children_map.get(obj, ())
+    return obj.children
+
+
 def traverse_children(obj, fn):
     fn(obj)
-    for obj in obj.children:
+    for obj in get_children(obj):
         fn(obj)
 
 
 def iter_object_tree(obj):
-    yield obj
-    for c in obj.children:
-        yield from iter_object_tree(c)
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        yield o
+        stack.extend(reversed(get_children(o)))
 
 
 def get_collection(name, reuse=True):
@@ -265,9 +343,9 @@ def unlink(obj):
     if not isinstance(obj, list):
         obj = [obj]
     for o in obj:
-        for c in list(bpy.data.collections) + [bpy.context.scene.collection]:
-            if o.name in c.objects:
-                c.objects.unlink(o)
+        # users_collection only holds the collections which actually contain o, including the scene collection
+        for c in list(o.users_collection):
+            c.objects.unlink(o)
 
 
 def put_in_collection(obj, collection, exclusive=True):
@@ -319,11 +397,20 @@ def spawn_empty(name, disp_type='PLAIN_AXES', s=0.1):
 
 
 def spawn_point_cloud(name, pts, edges=None):
-    if edges is None:
-        edges = []
+
+    # float32 / int32 buffers let foreach_set memcpy directly rather than converting per-element
+    pts = np.ascontiguousarray(pts, dtype=np.float32).reshape(-1, 3)
 
     mesh = bpy.data.meshes.new(name=name)
-    mesh.from_pydata(pts, edges, [])
+    mesh.vertices.add(len(pts))
+    mesh.vertices.foreach_set("co", pts.ravel())
+    if edges is not None and len(edges):
+        edges = np.ascontiguousarray(edges, dtype=np.int32).reshape(-1, 2)
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", edges.ravel())
+    mesh.update()
+    mesh.validate()
+
     obj = bpy.data.objects.new(name, mesh)
     bpy.context.scene.collection.objects.link(obj)
     return obj
@@ -334,8 +421,10 @@ def spawn_vert(name='vert'):
 
 
 def spawn_line(name, pts):
-    idxs = np.arange(len(pts))
-    edges = np.stack([idxs[:-1], idxs[1:]], axis=-1)
+    n = len(pts)
+    edges = np.empty((max(n - 1, 0), 2), dtype=np.int32)
+    edges[:, 0] = np.arange(n - 1, dtype=np.int32)
+    edges[:, 1] = edges[:, 0] + 1
     return spawn_point_cloud(name, pts, edges=edges)
 
 def spawn_plane(**kwargs):
@@ -430,10 +519,15 @@ def get_camera_res():
 
 def set_geomod_inputs(mod, inputs: dict):
     assert mod.type == 'NODES'
+
+    ng_inputs = mod.node_group.inputs
     for k, v in inputs.items():
-        soc = mod.node_group.inputs[k]
-        if isinstance(soc.default_value, (float, int)):
-            v = type(soc.default_value)(v)
+        soc = ng_inputs.get(k)
+        if soc is None:
+            raise KeyError(f'{k=} is not an input of {mod.node_group.name=}')
+        default = getattr(soc, 'default_value', None)
+        if isinstance(default, (float, int)):
+            v = type(default)(v)
 
         try:
             mod[soc.identifier] = v
@@ -450,11 +544,11 @@ def modify_mesh(obj, type, apply=True, name=None, return_mod=False, ng_inputs=No
         show_viewport = not apply
 
     mod = obj.modifiers.new(name, type)
-    mod.show_viewport = show_viewport
 
     if mod is None:
         raise ValueError(f'modifer.new() returned None, ensure {obj.type=} is valid for modifier {type=}')
 
+    mod.show_viewport = show_viewport
     for k, v in kwargs.items():
         setattr(mod, k, v)
     if ng_inputs is not None:
@@ -511,15 +605,20 @@ def import_mesh(path, **kwargs):
 def boolean(objs, mode='UNION', verbose=False):
     keep, *rest = list(objs)
 
+    for target in rest:
+        if len(target.modifiers) != 0:
+            raise ValueError(
+                f'Attempted to boolean() with {target=} which still has {len(target.modifiers)=}')
+
     if verbose:
-        rest = tqdm(rest, desc=f'butil.boolean({keep.name}..., {mode=})')
+        # throttle refreshes so the bar adds little overhead for long lists
+        rest = tqdm(rest, desc=f'butil.boolean({keep.name}..., {mode=})',
+                    miniters=max(1, len(rest) // 100), mininterval=0.5)
 
+    # apply each boolean as soon as it is added, a stack of unapplied booleans would be
+    # re-evaluated by every subsequent modifier_apply
     with SelectObjects(keep):
         for target in rest:
-            if len(target.modifiers) != 0:
-                raise ValueError(
-                    f'Attempted to boolean() with {target=} which still has {len(target.modifiers)=}')
-
             mod = keep.modifiers.new(type='BOOLEAN', name='butil.boolean()')
             mod.operation = mode
             mod.object = target
@@ -544,14 +643,15 @@ def join_objects(objs, check_attributes=False):
     if check_attributes:
         # make sure objs[0] has slots to recieve all the attributes of objs[1:]
         join_target = objs[0]
+        target_atts = {a.name: (a.data_type, a.domain) for a in join_target.data.attributes}
         for obj in objs:
             for att in obj.data.attributes:
-                if att.name in join_target.data.attributes:
-                    target_att = join_target.data.attributes[att.name]
-                    assert att.data_type == target_att.data_type
-                    assert att.domain == target_att.domain
+                spec = (att.data_type, att.domain)
+                if att.name in target_atts:
+                    assert spec == target_atts[att.name]
                 else:
-                    join_target.data.attributes.new(att.name, att.data_type, att.domain)
+                    join_target.data.attributes.new(att.name, *spec)
+                    target_atts[att.name] = spec
 
     select(objs)
     bpy.context.view_layer.objects.active = objs[0]
@@ -615,9 +715,12 @@ def joined_kd(objs, include_origins=False):
 
     i = 0
     for o in objs:
-        for v in o.data.vertices:
-            assert i < size
-            kd.insert(o.matrix_world @ v.co, i)
+        co = np.empty(len(o.data.vertices) * 3, dtype=np.float32)
+        o.data.vertices.foreach_get("co", co)
+        co = apply_matrix_world(o, co.reshape(-1, 3))
+        assert i + len(co) <= size
+        for p in co:
+            kd.insert(p, i)
             i += 1
         if include_origins:
             kd.insert(o.location, i)
@@ -734,7 +837,10 @@ def apply_geo(obj):
                 bpy.ops.object.modifier_apply(modifier=m.name)
 
 def avg_approx_vol(objects):
-    return np.mean([prod(list(o.dimensions)) for o in objects])
+    dims = np.empty((len(objects), 3), dtype=np.float32)
+    for i, o in enumerate(objects):
+        dims[i] = o.dimensions
+    return float(dims.prod(axis=1).mean(dtype=np.float64))
 
 def parent_to(a, b, type='OBJECT', keep_transform=False, no_inverse=False, no_transform=False):
     select_none()
@@ -751,14 +857,19 @@ def parent_to(a, b, type='OBJECT', keep_transform=False, no_inverse=False, no_tr
     assert a.parent is b
 
 def apply_matrix_world(obj, verts: np.array):
-    return mutil.dehomogenize(mutil.homogenize(verts) @ np.array(obj.matrix_world).T)
+    verts = np.asarray(verts)
+    dtype = verts.dtype if np.issubdtype(verts.dtype, np.floating) else np.float64
+    M = np.asarray(obj.matrix_world, dtype=dtype)
+    if not np.array_equal(M[3], (0, 0, 0, 1)):
+        # projective matrix, needs the full homogeneous divide
+        return mutil.dehomogenize(mutil.homogenize(verts) @ M.T)
+    return mutil.apply_affine(verts, M)
 
 def surface_area(obj: bpy.types.Object):
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    area = sum(f.calc_area() for f in bm.faces)
-    bm.free()
-    return area
+    me = obj.data
+    areas = np.empty(len(me.polygons), dtype=np.float32)
+    me.polygons.foreach_get("area", areas)
+    return float(areas.sum(dtype=np.float64))
 
 def approve_all_drivers():
 
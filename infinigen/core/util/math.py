@@ -14,6 +14,11 @@ import numpy as np
 import gin
 import cv2
 
+try:
+    from ._math_ext import apply_mat4
+except ImportError:
+    apply_mat4 = None # not compiled, eg a minimal install
+
 @gin.configurable
 class FixedSeed:
 
@@ -312,6 +317,67 @@ def homogenize(points):
 def dehomogenize(points):
     return points[..., :-1] / points[..., [-1]]
 
+
+# below this many vertices, numba's thread pool costs more than it saves
+AFFINE_PARALLEL_MIN_VERTS = 100000
+
+_numba_kernels = None
+
+def _get_numba_kernels():
+    # numba is optional and slow to import, so only load it on first use
+    global _numba_kernels
+    if _numba_kernels is None:
+        try:
+            from . import _math_numba
+            _numba_kernels = _math_numba
+        except ImportError:
+            _numba_kernels = False
+    return _numba_kernels or None
+
+
+def _apply_affine_numpy(verts, M):
+    R = np.asarray(M[:3, :3], dtype=verts.dtype)
+    out = verts @ R.T
+    out += np.asarray(M[:3, 3], dtype=verts.dtype)
+    return out
+
+
+def _apply_affine_numba(verts, M, kernels):
+    R = np.ascontiguousarray(M[:3, :3], dtype=verts.dtype)
+    t = np.ascontiguousarray(M[:3, 3], dtype=verts.dtype)
+    flat = np.ascontiguousarray(verts.reshape(-1, 3))
+    out = np.empty_like(flat)
+    if len(flat) >= AFFINE_PARALLEL_MIN_VERTS:
+        kernels.apply_affine_parallel(flat, R, t, out)
+    else:
+        kernels.apply_affine_serial(flat, R, t, out)
+    return out.reshape(verts.shape)
+
+
+def _apply_affine_cython(verts, M):
+    # apply_mat4 only accepts float32
+    flat = np.ascontiguousarray(verts.reshape(-1, 3))
+    out = np.empty_like(flat)
+    apply_mat4(flat, np.ascontiguousarray(M, dtype=np.float32), out)
+    return out.reshape(verts.shape)
+
+
+def apply_affine(verts, M):
+    # verts: (..., 3), M: 4x4 affine matrix, ie last row is (0, 0, 0, 1)
+    # uses the compiled cython kernel for float32 when it is built, else numba for
+    # float32/float64 when it is installed, else plain numpy. All agree up to float rounding
+    verts = np.asarray(verts)
+    if not np.issubdtype(verts.dtype, np.floating):
+        verts = verts.astype(np.float64)
+    if apply_mat4 is not None and verts.dtype == np.float32:
+        return _apply_affine_cython(verts, M)
+    if verts.dtype in (np.float32, np.float64):
+        kernels = _get_numba_kernels()
+        if kernels is not None:
+            return _apply_affine_numba(verts, M, kernels)
+    # float16 / longdouble etc cannot be typed by numba
+    return _apply_affine_numpy(verts, M)
+
 def clip_gaussian(mean, std, min, max, max_tries=20):
     assert min <= max
     i = 0
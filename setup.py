@@ -53,6 +53,11 @@ if not MINIMAL_INSTALL:
         sources=["infinigen/assets/creatures/util/geometry/cpp_utils/bnurbs.pyx"],
         include_dirs=[numpy.get_include()]
     ))
+    cython_extensions.append(Extension(
+        name="infinigen.core.util._math_ext",
+        sources=["infinigen/core/util/_math_ext.pyx"],
+        extra_compile_args=["-O3"]
+    ))
     if BUILD_TERRAIN:
         cython_extensions.append(
             Extension(
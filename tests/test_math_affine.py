@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from infinigen.core.util import math as mutil
+
+def random_affine(rng):
+    M = np.eye(4)
+    M[:3, :3] = rng.normal(size=(3, 3))
+    M[:3, 3] = rng.normal(size=3)
+    return M
+
+def reference(verts, M):
+    return mutil.dehomogenize(mutil.homogenize(verts.astype(np.float64)) @ M.T)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+@pytest.mark.parametrize('n', [0, 1, 1000])
+def test_apply_affine_numpy(dtype, n):
+    rng = np.random.default_rng(0)
+    M = random_affine(rng)
+    verts = rng.normal(size=(n, 3)).astype(dtype)
+    out = mutil._apply_affine_numpy(verts, M)
+    assert out.dtype == dtype
+    np.testing.assert_allclose(out, reference(verts, M), rtol=1e-4, atol=1e-4)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+@pytest.mark.parametrize('n', [0, 1, 1000, mutil.AFFINE_PARALLEL_MIN_VERTS])
+def test_apply_affine_numba(dtype, n):
+    kernels = mutil._get_numba_kernels()
+    if kernels is None:
+        pytest.skip('numba is not installed')
+    rng = np.random.default_rng(0)
+    M = random_affine(rng)
+    verts = rng.normal(size=(n, 3)).astype(dtype)
+    out = mutil._apply_affine_numba(verts, M, kernels)
+    assert out.dtype == dtype
+    np.testing.assert_allclose(out, reference(verts, M), rtol=1e-4, atol=1e-4)
+
+NUMBA_CACHE_PROBE = '''
+import sys
+import numpy as np
+from infinigen.core.util import _math_numba as kernels
+v = np.ones((10, 3)); R = np.eye(3); t = np.zeros(3); out = np.empty_like(v)
+if sys.argv[1] == 'serial':
+    kernels.apply_affine_serial(v, R, t, out)
+else:
+    d = kernels.apply_affine_parallel
+    d(v, R, t, out)
+    sig = d.signatures[0]
+    print(sum(d.stats.cache_hits.values()), 'parfor' in d.inspect_llvm(sig))
+'''
+
+def test_numba_parallel_kernel_not_shared_with_serial(tmp_path):
+    if mutil._get_numba_kernels() is None:
+        pytest.skip('numba is not installed')
+
+    # a fresh process must compile its own parallel build rather than loading a cached serial one
+    repo_root = Path(__file__).parents[1]
+    env = dict(os.environ, NUMBA_CACHE_DIR=str(tmp_path),
+               PYTHONPATH=os.pathsep.join([str(repo_root), os.environ.get('PYTHONPATH', '')]))
+    def run(mode):
+        return subprocess.run([sys.executable, '-c', NUMBA_CACHE_PROBE, mode], env=env,
+                              check=True, capture_output=True, text=True).stdout.split()
+
+    run('serial')
+    assert run('parallel') == ['0', 'True']
+
+@pytest.mark.parametrize('dtype', [np.float16, np.float32, np.float64, np.int64])
+def test_apply_affine_dispatch(dtype):
+    rng = np.random.default_rng(0)
+    M = random_affine(rng)
+    verts = (rng.normal(size=(2, 5, 3)) * 10).astype(dtype)
+    out = mutil.apply_affine(verts, M)
+    assert out.shape == verts.shape
+    tol = 1e-1 if dtype == np.float16 else 1e-3
+    np.testing.assert_allclose(out, reference(verts.reshape(-1, 3), M).reshape(verts.shape), rtol=tol, atol=tol)
+
+@pytest.mark.parametrize('n', [0, 1, 1000])
+def test_apply_affine_cython(n):
+    if mutil.apply_mat4 is None:
+        pytest.skip('infinigen.core.util._math_ext is not compiled')
+    rng = np.random.default_rng(0)
+    M = random_affine(rng)
+    verts = rng.normal(size=(n, 3)).astype(np.float32)
+    out = mutil._apply_affine_cython(verts, M)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, reference(verts, M), rtol=1e-4, atol=1e-4)
+
+@pytest.mark.parametrize('verts_shape, M_shape, out_shape', [
+    ((4, 3), (3, 3), (4, 3)),
+    ((4, 2), (4, 4), (4, 2)),
+    ((4, 3), (4, 4), (2, 3)),
+])
+def test_apply_mat4_rejects_bad_shapes(verts_shape, M_shape, out_shape):
+    if mutil.apply_mat4 is None:
+        pytest.skip('infinigen.core.util._math_ext is not compiled')
+    verts = np.zeros(verts_shape, dtype=np.float32)
+    M = np.zeros(M_shape, dtype=np.float32)
+    out = np.zeros(out_shape, dtype=np.float32)
+    with pytest.raises(ValueError):
+        mutil.apply_mat4(verts, M, out)